@@ -3,18 +3,17 @@
 # Authors: Alankar Misra, Claude.ai, ChatGPT
 
 import time
-import csv
 import os
 import sys
-import select
+import selectors
 import tty
 import termios
 import subprocess
 import platform
 import shutil
-import threading
 import json
-from datetime import datetime
+import re
+from collections import namedtuple
 
 # === Config Management ===
 CONFIG_FILE = 'pymodoro_config.json'
@@ -53,19 +52,45 @@ def load_config():
     
     return DEFAULT_CONFIG.copy()
 
-CONFIG = load_config()
+# Frozen after load so hot paths use attribute access instead of dict lookups
+Config = namedtuple('Config', DEFAULT_CONFIG.keys())
+CFG = Config(**{key: value for key, value in load_config().items() if key in DEFAULT_CONFIG})
+
+# Only the title column can ever need CSV quoting
+_needs_quote = re.compile(r'[,"\n\r]').search
+
+def _now_iso():
+    """Local time as an ISO 8601 string, without building a datetime object."""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime())
 
 class PomodoroTimer:
+    # Precomputed, UTF-8 encoded progress line pieces; a bar is a 30-char
+    # slice of the template ('█' and '░' are both 3 bytes wide)
+    _BAR_WIDTH = 30
+    _CHAR_BYTES = 3
+    _BAR_TEMPLATE_BYTES = ('█' * _BAR_WIDTH + '░' * _BAR_WIDTH).encode()
+    _PCT = [f'{i}%'.encode() for i in range(101)]
+    _PREFIX = '\r⏳ '.encode()
+    _SEP = b' '
+
     def __init__(self):
         self.paused = False
-        self.pause_lock = threading.Lock()
         self.current_session = None  # Track current session for partial logging
+        self._last_render = None  # Last MM:SS drawn by run_timer
+        self._label_bytes = b''  # Encoded label of the running timer
+        self._log_fh = None  # Opened once in run(), kept open for the whole run
+        # Register stdin once; DefaultSelector is epoll/kqueue where available
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(sys.stdin, selectors.EVENT_READ)
+        self._children = []  # Notifier processes still running in the background
+        # Probing PATH for notifiers is slow, so do it once
+        self._notify_backend = self._detect_notify_backend()
         
     def get_last_title(self):
         """Get the last used session title."""
         try:
-            if os.path.exists(CONFIG['STATE_FILE']):
-                with open(CONFIG['STATE_FILE']) as f:
+            if os.path.exists(CFG.STATE_FILE):
+                with open(CFG.STATE_FILE) as f:
                     return f.read().strip()
         except IOError:
             print("Warning: Could not read last title file.")
@@ -74,65 +99,132 @@ class PomodoroTimer:
     def save_last_title(self, title):
         """Save the session title for next time."""
         try:
-            with open(CONFIG['STATE_FILE'], "w") as f:
+            with open(CFG.STATE_FILE, "w") as f:
                 f.write(title)
         except IOError:
             print("Warning: Could not save title file.")
 
+    def create_log(self):
+        """Create the CSV log with its header if it doesn't exist yet."""
+        try:
+            # O_EXCL: only the instance that creates the file writes the header
+            fd = os.open(CFG.LOG_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return
+        except OSError:
+            print("Warning: Could not create log file.")
+            return
+        try:
+            os.write(fd, b'title,minutes,datetime,type\r\n')
+        finally:
+            os.close(fd)
+
+    def open_log(self):
+        """Open the existing CSV log for appending, kept open for the whole run."""
+        try:
+            # Unbuffered + O_APPEND: each row is one atomic end-of-file write,
+            # so several pymodoro instances can share one log safely. No O_CREAT:
+            # only create_log() may create the file, header included.
+            fd = os.open(CFG.LOG_FILE, os.O_WRONLY | os.O_APPEND)
+            self._log_fh = os.fdopen(fd, 'ab', buffering=0)
+        except OSError:
+            print("Warning: Could not open log file.")
+
+    def close_log(self):
+        """Flush and close the CSV log if it is open."""
+        if self._log_fh is not None:
+            try:
+                self._log_fh.close()
+            except IOError:
+                print("Warning: Could not close log file.")
+            self._log_fh = None
+
     def log_session(self, title, minutes, session_type="work"):
         """Log completed session to CSV file."""
+        if self._log_fh is None:
+            print("Warning: Could not write to log file.")
+            return
         try:
-            file_exists = os.path.isfile(CONFIG['LOG_FILE'])
-            with open(CONFIG['LOG_FILE'], mode='a', newline='') as f:
-                writer = csv.writer(f)
-                if not file_exists or os.stat(CONFIG['LOG_FILE']).st_size == 0:
-                    writer.writerow(['title', 'minutes', 'datetime', 'type'])
-                writer.writerow([title, minutes, datetime.now().isoformat(), session_type])
+            if _needs_quote(title):
+                title = '"' + title.replace('"', '""') + '"'
+            self._log_fh.write(f'{title},{minutes},{_now_iso()},{session_type}\r\n'.encode('utf-8'))
         except IOError:
             print("Warning: Could not write to log file.")
 
     def log_partial_session(self, title, elapsed_seconds, session_type="work"):
         """Log a partial session if it meets minimum duration requirements."""
-        if elapsed_seconds >= CONFIG['MIN_SECONDS_TO_LOG']:
+        if elapsed_seconds >= CFG.MIN_SECONDS_TO_LOG:
             minutes = elapsed_seconds / 60
             self.log_session(title, round(minutes, 2), f"partial_{session_type}")
             print(f"\n📝 Logged partial session: {round(minutes, 1)} minutes")
 
+    def _detect_notify_backend(self):
+        """Pick the notification method for this system once, at startup."""
+        system = platform.system()
+        if system == "Darwin":
+            return self._notify_darwin
+        if system == "Linux":
+            self._has_notify_send = shutil.which("notify-send") is not None
+            self._sound_cmd = None
+            for sound_cmd in [["paplay", "/usr/share/sounds/alsa/Front_Right.wav"],
+                              ["aplay", "/usr/share/sounds/alsa/Front_Right.wav"],
+                              ["play", "-q", "/usr/share/sounds/sound-icons/bell.wav"]]:
+                if shutil.which(sound_cmd[0]):
+                    self._sound_cmd = sound_cmd
+                    break
+            return self._notify_linux
+        if system == "Windows":
+            # Import the Windows-only modules here, once, not on every notify
+            try:
+                import win10toast
+                self._toaster = win10toast.ToastNotifier()
+            except ImportError:
+                self._toaster = None
+            import winsound
+            self._beep = winsound.Beep
+            return self._notify_windows
+        return self._notify_print
+
+    def _spawn(self, args):
+        """Start a helper process without waiting for it; reap earlier ones."""
+        self._children = [child for child in self._children if child.poll() is None]
+        self._children.append(subprocess.Popen(args, stdout=subprocess.DEVNULL,
+                                               stderr=subprocess.DEVNULL, close_fds=True))
+
+    def _notify_print(self, title, message):
+        """Fallback notification: print to the terminal."""
+        print(f"\n🔔 [{title}] {message}")
+
+    def _notify_darwin(self, title, message):
+        """Native macOS notification plus the Glass sound."""
+        self._spawn(["osascript", "-e", 
+                     f'display notification "{message}" with title "{title}"'])
+        self._spawn(["afplay", "/System/Library/Sounds/Glass.aiff"])
+
+    def _notify_linux(self, title, message):
+        """notify-send and a sound, if available, plus a terminal message."""
+        if self._has_notify_send:
+            self._spawn(["notify-send", title, message])
+        if self._sound_cmd:
+            self._spawn(self._sound_cmd)
+        self._notify_print(title, message)
+
+    def _notify_windows(self, title, message):
+        """Toast notification (if win10toast is installed) plus a beep."""
+        # Windows notification (requires Windows 10+)
+        if self._toaster is not None:
+            self._toaster.show_toast(title, message, duration=5)
+        else:
+            self._notify_print(title, message)
+        # Windows beep
+        self._beep(800, 500)
+
     def notify(self, title, message):
         """Send system notification with sound."""
-        system = platform.system()
         try:
-            if system == "Darwin":
-                subprocess.run(["osascript", "-e", 
-                              f'display notification "{message}" with title "{title}"'], 
-                              check=False)
-                os.system("afplay /System/Library/Sounds/Glass.aiff")
-            elif system == "Linux":
-                if shutil.which("notify-send"):
-                    subprocess.run(["notify-send", title, message], check=False)
-                # Try to play a sound
-                for sound_cmd in ["paplay /usr/share/sounds/alsa/Front_Right.wav",
-                                "aplay /usr/share/sounds/alsa/Front_Right.wav",
-                                "play -q /usr/share/sounds/sound-icons/bell.wav"]:
-                    if shutil.which(sound_cmd.split()[0]):
-                        os.system(f"{sound_cmd} 2>/dev/null &")
-                        break
-                print(f"\n🔔 [{title}] {message}")
-            elif system == "Windows":
-                # Windows notification (requires Windows 10+)
-                try:
-                    import win10toast
-                    toaster = win10toast.ToastNotifier()
-                    toaster.show_toast(title, message, duration=5)
-                except ImportError:
-                    print(f"\n🔔 [{title}] {message}")
-                # Windows beep
-                import winsound
-                winsound.Beep(800, 500)
-            else:
-                print(f"\n🔔 [{title}] {message}")
+            self._notify_backend(title, message)
         except Exception:
-            print(f"\n🔔 [{title}] {message}")
+            self._notify_print(title, message)
 
     def prompt_for_title(self):
         """Prompt user for session title with timeout."""
@@ -141,10 +233,10 @@ class PomodoroTimer:
         print("Press Enter to change it, or wait 5 seconds to continue...")
         sys.stdout.flush()
 
-        # Use select with timeout
-        if sys.stdin in select.select([sys.stdin], [], [], 5)[0]:
-            key = sys.stdin.read(1)
-            if key == '\n':
+        # Wait up to 5 seconds for a keypress
+        if self._sel.select(timeout=5):
+            key = os.read(sys.stdin.fileno(), 1)
+            if key == b'\n':
                 # Reset terminal for input
                 termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
                 try:
@@ -155,31 +247,54 @@ class PomodoroTimer:
         
         return last or "Pymodoro"
 
-    def handle_input(self):
-        """Handle keyboard input in a separate thread."""
-        while True:
-            if sys.stdin in select.select([sys.stdin], [], [], 0.1)[0]:
-                try:
-                    cmd = sys.stdin.read(1).lower()
-                    if cmd == 'p':
-                        with self.pause_lock:
-                            self.paused = not self.paused
-                except:
-                    break
+    def handle_input(self, timeout):
+        """Wait up to `timeout` seconds (forever if None) for a key and apply it."""
+        for key, _ in self._sel.select(timeout=timeout):
+            # os.read skips sys.stdin's buffered reader, which could otherwise
+            # swallow bytes the selector would never report again
+            try:
+                cmd = os.read(key.fileobj.fileno(), 1).lower()
+            except OSError:
+                return
+            if cmd == b'p':
+                self.paused = not self.paused
 
     def create_progress_bar(self, current, total, width=30):
-        """Create a simple progress bar."""
+        """Create a simple progress bar as UTF-8 encoded bytes."""
         # Ensure progress never exceeds 100%
-        progress = min(1.0, max(0.0, (total - current) / total))
+        progress = min(1.0, max(0.0, (total - current) / total)) if total > 0 else 1.0
         filled = int(width * progress)
-        bar = '█' * filled + '░' * (width - filled)
-        percentage = int(100 * progress)
-        return f'[{bar}] {percentage}%'
+        if width == self._BAR_WIDTH:
+            start = (width - filled) * self._CHAR_BYTES
+            bar = self._BAR_TEMPLATE_BYTES[start:start + width * self._CHAR_BYTES]
+        else:
+            bar = ('█' * filled + '░' * (width - filled)).encode()
+        return b''.join([b'[', bar, b'] ', self._PCT[int(100 * progress)]])
+
+    def write_frame(self, *parts):
+        """Join the pieces of a status line and write them in one os.write."""
+        # Push out any pending print() text first so it isn't overtaken when
+        # stdout is a pipe or file (a no-op on a terminal)
+        sys.stdout.flush()
+        os.write(sys.stdout.fileno(), b''.join(parts))
+
+    def render_progress(self, clock, progress_bar):
+        """Write the progress line straight to the terminal, bypassing print()."""
+        self.write_frame(self._PREFIX, clock.encode(), self._SEP,
+                         progress_bar, self._SEP, self._label_bytes)
 
     def run_timer(self, minutes, label, session_type="work"):
-        """Run a timer with pause/resume functionality."""
+        """Run a timer with pause/resume functionality.
+
+        Returns False without doing anything if there is less than a second to
+        time, True once the timer has run to completion.
+        """
         total_seconds = int(minutes * 60)
-        start_time = time.time()
+        if total_seconds <= 0:
+            return False  # Nothing to time, notify, track or log
+        start_time = time.monotonic()
+        deadline = start_time + total_seconds
+        pause_started = None  # Set while paused
         
         # Track current session for partial logging
         self.current_session = {
@@ -189,56 +304,59 @@ class PomodoroTimer:
             'total_seconds': total_seconds
         }
         
-        # Start input handler thread
-        input_thread = threading.Thread(target=self.handle_input, daemon=True)
-        input_thread.start()
-        
         print(f"⏱️  {label} — Press 'p' to pause/resume. Ctrl+C to quit.")
+        self._last_render = None
+        self._label_bytes = label.encode()
+        paused_line = f"\r⏸️  Paused - {label} (Press 'p' to resume)     ".encode()
         
         try:
             while True:
-                with self.pause_lock:
-                    if not self.paused:
-                        elapsed = time.time() - start_time
-                        remaining = total_seconds - elapsed
-                        
-                        if remaining <= 0:
-                            # Show 100% completion before breaking
-                            print(f"\r⏳ 00:00 [{'█' * 30}] 100% {label}", 
-                                  end='', flush=True)
-                            break
-                        
-                        # Ensure we don't show negative time
-                        remaining = max(0, remaining)
-                        mins, secs = divmod(int(remaining), 60)
+                if not self.paused:
+                    remaining = deadline - time.monotonic()
+                    
+                    if remaining <= 0:
+                        # Show 100% completion before breaking
+                        self.render_progress("00:00", self.create_progress_bar(0, total_seconds))
+                        break
+                    
+                    # Only redraw when the displayed MM:SS actually changes
+                    mins, secs = divmod(int(remaining), 60)
+                    clock = f"{mins:02d}:{secs:02d}"
+                    if clock != self._last_render:
                         progress_bar = self.create_progress_bar(remaining, total_seconds)
-                        print(f"\r⏳ {mins:02d}:{secs:02d} {progress_bar} {label}", 
-                              end='', flush=True)
-                    else:
-                        print(f"\r⏸️  Paused - {label} (Press 'p' to resume)     ", 
-                              end='', flush=True)
-                        # Adjust start time to account for pause
-                        pause_start = time.time()
-                
-                time.sleep(0.1)  # More responsive updates
+                        self.render_progress(clock, progress_bar)
+                        self._last_render = clock
+                    # Wake up exactly when the next second ticks over
+                    timeout = remaining % 1.0 or 1.0
+                else:
+                    self.write_frame(paused_line)
+                    self._last_render = None  # Force a redraw on resume
+                    timeout = None  # Nothing to redraw until a key arrives
                 
-                # If we were paused, adjust the start time
-                if self.paused:
-                    start_time += time.time() - pause_start
+                # Sleep until the next redraw, waking early on a keypress
+                was_paused = self.paused
+                self.handle_input(timeout)
+                if self.paused and not was_paused:
+                    pause_started = time.monotonic()
+                elif was_paused and not self.paused:
+                    # Push the deadline back by the time spent paused
+                    deadline += time.monotonic() - pause_started
+                    pause_started = None
 
             print(f"\n✅ Finished: {label}")
-            
-            # Only send notification if it's not a 0-minute break session
-            if minutes > 0 or session_type == "work":
-                self.notify("Pymodoro", f"{label} complete!")
+            self.notify("Pymodoro", f"{label} complete!")
             
             # Clear current session since it completed normally
             self.current_session = None
+            return True
             
         except KeyboardInterrupt:
             # Handle partial session logging on interrupt
             if self.current_session:
-                elapsed_seconds = time.time() - self.current_session['start_time']
+                # Time actually worked: the deadline already excludes finished
+                # pauses, and an ongoing pause stops the clock at pause_started
+                now = pause_started if pause_started is not None else time.monotonic()
+                elapsed_seconds = total_seconds - (deadline - now)
                 self.log_partial_session(
                     self.current_session['title'], 
                     elapsed_seconds, 
@@ -262,32 +380,41 @@ class PomodoroTimer:
             tty.setcbreak(sys.stdin.fileno())
 
             print(f"\n🍅 Starting Pomodoro sessions for: {title}")
-            print(f"Work: {CONFIG['WORK_MINUTES']}min, Short break: {CONFIG['SHORT_BREAK_MINUTES']}min, Long break: {CONFIG['LONG_BREAK_MINUTES']}min")
-            print(f"Minimum session duration to log on exit: {CONFIG['MIN_SECONDS_TO_LOG']} seconds\n")
+            print(f"Work: {CFG.WORK_MINUTES}min, Short break: {CFG.SHORT_BREAK_MINUTES}min, Long break: {CFG.LONG_BREAK_MINUTES}min")
+            print(f"Minimum session duration to log on exit: {CFG.MIN_SECONDS_TO_LOG} seconds\n")
+            self.create_log()
+            self.open_log()
+
+            # Labels never change during a run, so build them once
+            work_label = f"Work — {title}"
+            short_label = "Short Break"
+            long_label = "Long Break"
 
             while True:
-                # Work session
-                self.run_timer(CONFIG['WORK_MINUTES'], f"Work — {title}", "work")
-                self.log_session(title, CONFIG['WORK_MINUTES'], "work")
+                # Work session (main() guarantees it is long enough to run)
+                if self.run_timer(CFG.WORK_MINUTES, work_label, "work"):
+                    self.log_session(title, CFG.WORK_MINUTES, "work")
                 session_count += 1
 
-                # Break session
-                if session_count % CONFIG['SESSIONS_BEFORE_LONG_BREAK'] == 0:
-                    self.run_timer(CONFIG['LONG_BREAK_MINUTES'], "Long Break", "long_break")
-                    self.log_session(title, CONFIG['LONG_BREAK_MINUTES'], "long_break")
+                # Break session; only logged if it actually ran
+                if session_count % CFG.SESSIONS_BEFORE_LONG_BREAK == 0:
+                    if self.run_timer(CFG.LONG_BREAK_MINUTES, long_label, "long_break"):
+                        self.log_session(title, CFG.LONG_BREAK_MINUTES, "long_break")
+                    else:
+                        print("⏭️  Skipping long break (less than a second configured)")
                     print(f"\n🎉 Completed {session_count} work sessions! Great job!\n")
                 else:
-                    if CONFIG['SHORT_BREAK_MINUTES'] > 0:
-                        self.run_timer(CONFIG['SHORT_BREAK_MINUTES'], "Short Break", "short_break")
-                        self.log_session(title, CONFIG['SHORT_BREAK_MINUTES'], "short_break")
+                    if self.run_timer(CFG.SHORT_BREAK_MINUTES, short_label, "short_break"):
+                        self.log_session(title, CFG.SHORT_BREAK_MINUTES, "short_break")
                     else:
-                        print("⏭️  Skipping short break (0 minutes configured)")
+                        print("⏭️  Skipping short break (less than a second configured)")
 
         except KeyboardInterrupt:
             print("\n👋 Exiting Pymodoro timer. Great work!")
         except Exception as e:
             print(f"\n❌ Error: {e}")
         finally:
+            self.close_log()
             termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
 
 def main():
@@ -301,9 +428,15 @@ def main():
         print("\nDuring timer:")
         print("  p - pause/resume")
         print("  Ctrl+C - quit")
-        print(f"\nConfig: {CONFIG['WORK_MINUTES']}min work, {CONFIG['SHORT_BREAK_MINUTES']}min short break, {CONFIG['LONG_BREAK_MINUTES']}min long break")
-        print(f"Minimum duration to log partial sessions: {CONFIG['MIN_SECONDS_TO_LOG']} seconds")
+        print(f"\nConfig: {CFG.WORK_MINUTES}min work, {CFG.SHORT_BREAK_MINUTES}min short break, {CFG.LONG_BREAK_MINUTES}min long break")
+        print(f"Minimum duration to log partial sessions: {CFG.MIN_SECONDS_TO_LOG} seconds")
         return
+
+    # A work session shorter than a second would never be timed, leaving
+    # the session loop spinning without ever waiting
+    if int(CFG.WORK_MINUTES * 60) <= 0:
+        print(f"❌ Error: WORK_MINUTES must be positive (got {CFG.WORK_MINUTES}). Check {CONFIG_FILE}.")
+        sys.exit(1)
     
     timer = PomodoroTimer()
     timer.run()